@@ -0,0 +1,95 @@
+"""
+Auto-generated stub file for IO.load() type hints.
+
+Generated by: python -m CLTrainingFramework.io
+Do not edit manually - regenerate after registering new handlers.
+
+Usage:
+    image = IO.load("test.png", modality="Image")  # -> PILImage
+    text = IO.load("file.txt", modality="Text")    # -> str
+    data = IO.load("config.json", modality="Text") # -> Union[str, dict]
+    video = IO.load("clip.mp4", modality="Video")  # -> VideoReader
+"""
+
+from typing import overload, Union, Optional, Any, Literal
+from os import PathLike
+from PIL.Image import Image as PILImage
+from torchvision.io import VideoReader
+
+
+class IO:
+    """
+    IO Router with type inference based on modality parameter.
+
+    When modality is specified, returns the corresponding type.
+    Without modality, returns Any (suffix-based auto-detection at runtime).
+    """
+
+    def __init__(self, modality: Optional[str] = None) -> None: ...
+
+    # modality="Image"
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Literal["Image"],
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> PILImage: ...
+
+    # modality="Text"
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Literal["Text"],
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Union[dict[str, Any], str]: ...
+
+    # modality="Video"
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Literal["Video"],
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> VideoReader: ...
+
+    # Fallback when modality is not specified (auto-detection)
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: None = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Any: ...
+
+    # Implementation signature
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Any: ...
+
+    def write(
+        self,
+        path: Union[str, PathLike[str]],
+        data: Any,
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> None: ...
+
+    def get_io(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+    ) -> Any: ...
+
+    def delete_cache(self, name: str) -> None: ...
@@ -72,6 +72,7 @@ def _update_register_dict(func):
         full_usage = _suffix_usage(self)
         collisions = {k: v for k, v in full_usage.items() if len(v) > 1}
         setattr(self, "collision_suffix", collisions)
+        self.version += 1
         return out
 
     return wrapper
@@ -81,6 +82,10 @@ class RegisterDict(dict):
     def __init__(self, *args, **kwargs):
         super(RegisterDict, self).__init__(*args, **kwargs)
         self.collision_suffix: dict[str, set[str]] = {}
+        # bumped on every mutation, consumers (e.g. stub generator) use it to invalidate caches.
+        # mutating a nested modality registry directly (e.g. self["Image"]["Custom"][sfx] = cls) is not
+        # tracked, call _collision_suffix_manually_update() afterwards to refresh collisions and version
+        self.version: int = 0
     def _collision_suffix_manually_update(self):
         """
         only be used when trigger can't work(for manual register)
@@ -88,6 +93,7 @@ class RegisterDict(dict):
         full_usage = _suffix_usage(self)
         collisions = {k:v for k,v in full_usage.items() if len(v) >1}
         setattr(self, "collision_suffix", collisions)
+        self.version += 1
 
     # callback function, tracing the suffix when updating the register
     # TODO 性能问题，每次都这样检查太傻了，有没有性能更高的解法？对于一个m模态，每个模态有n个后缀的字典，把一个O(1)的操作变成O(n*m)
@@ -180,6 +180,8 @@ class MetaIO(type):
                 else:
                     # TODO: 这里需要添如果覆盖之前注册过的类以后的行为
                     registry["Custom"][suffix] = cls
+        # nested registry is a plain dict, so the version won't be bumped by RegisterDict itself
+        _SuffixRegistry.version += 1
 
 
 def create_io_registry(
@@ -2,12 +2,26 @@
 CLI entry point for generating IO type stubs.
 
 Usage:
-    python -m CLTrainingFramework.io
+    python -m CLTrainingFramework.io [--output-dir DIR]
 """
 
+import argparse
+from pathlib import Path
+from typing import Optional, Sequence
+
 from CLTrainingFramework.io.stub_generator import generate_io_stubs, print_registry_summary
 
-if __name__ == "__main__":
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m CLTrainingFramework.io")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="directory to write Mapping.pyi into, defaults to the imported io package",
+    )
+    args = parser.parse_args(argv)
+
     print("=" * 50)
     print("IO Type Stub Generator")
     print("=" * 50)
@@ -16,7 +30,11 @@ if __name__ == "__main__":
     print_registry_summary()
     print()
 
-    output_file = generate_io_stubs()
+    output_file = generate_io_stubs(args.output_dir)
     print(f"Stub file generated: {output_file}")
     print()
-    print("PyCharm should now provide type hints for IO.load()")
\ No newline at end of file
+    print("PyCharm should now provide type hints for IO.load()")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,22 @@ IO 类型存根自动生成器
 此模块用于生成 IO.load() 方法的类型存根文件，使 IDE 能够根据文件后缀推断返回类型。
 
 使用方式：
-    python -m CLTrainingFramework.io
+    python -m CLTrainingFramework.io [--output-dir DIR]
+
+    或通过 pre-commit（仅在 IO 注册表、handler 或本生成器变更时触发，见 .pre-commit-config.yaml）
 
     或在代码中：
     from CLTrainingFramework.io import generate_io_stubs
     generate_io_stubs()
 """
 
+import hashlib
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Iterator, Mapping, NamedTuple, Optional
+from weakref import WeakKeyDictionary
 
 from CLTrainingFramework.io.Protocol import _SuffixRegistry as IORegistry
 
@@ -38,38 +45,179 @@ TYPE_STUB_NAMES: dict[str, str] = {
     "torchvision.io.VideoReader": "VideoReader",
 }
 
+# stub 文件头（固定内容，预先编码为 bytes）
+_HEADER_BYTES = b'''"""
+Auto-generated stub file for IO.load() type hints.
+
+Generated by: python -m CLTrainingFramework.io
+Do not edit manually - regenerate after registering new handlers.
+
+Usage:
+    image = IO.load("test.png", modality="Image")  # -> PILImage
+    text = IO.load("file.txt", modality="Text")    # -> str
+    data = IO.load("config.json", modality="Text") # -> Union[str, dict]
+    video = IO.load("clip.mp4", modality="Video")  # -> VideoReader
+"""
+
+from typing import overload, Union, Optional, Any, Literal
+from os import PathLike
+'''
+
+# 类定义开头（位于类型 imports 之后，固定内容）
+_CLASS_BYTES = b'''
+
+class IO:
+    """
+    IO Router with type inference based on modality parameter.
+
+    When modality is specified, returns the corresponding type.
+    Without modality, returns Any (suffix-based auto-detection at runtime).
+    """
+
+    def __init__(self, modality: Optional[str] = None) -> None: ...
+
+'''
+
+# 单个 modality 的 @overload 块
+_OVERLOAD_TEMPLATE = '''    # modality="{modality}"
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Literal["{modality}"],
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> {stub_type}: ...
+
+'''
+
+# fallback overload、实现签名及其余方法（固定内容）
+_FOOTER_BYTES = b'''    # Fallback when modality is not specified (auto-detection)
+    @overload
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: None = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Any: ...
+
+    # Implementation signature
+    def load(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Any: ...
+
+    def write(
+        self,
+        path: Union[str, PathLike[str]],
+        data: Any,
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> None: ...
+
+    def get_io(
+        self,
+        path: Union[str, PathLike[str]],
+        modality: Optional[str] = None,
+        collision_dict: Optional[dict[str, str]] = None,
+    ) -> Any: ...
+
+    def delete_cache(self, name: str) -> None: ...
+'''
+
+
+class SuffixInfo(NamedTuple):
+    """单个后缀最终生效的注册信息。"""
+
+    modality: str
+    return_type: str
+
+
+# _collect_suffix_info 的结果缓存，键为 (id(IORegistry), IORegistry.version)
+_CACHE: Optional[
+    tuple[Mapping[str, tuple[str, ...]], Mapping[str, tuple[str, ...]]]
+] = None
+_CACHE_KEY: Optional[tuple[int, int]] = None
+
+# 有序返回类型元组 -> stub 中的类型字符串，注册表变化时随 _CACHE 一起清空
+_STUB_TYPE_CACHE: dict[tuple[str, ...], str] = {}
+
+# handler 类 -> 返回类型字符串，只在一次 _collect_suffix_info 重新计算内有效
+_RETURN_TYPE_CACHE: WeakKeyDictionary[type, str] = WeakKeyDictionary()
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def _normalize_suffix(suffix: str) -> str:
+    """
+    规范化后缀（去掉一个前导点并转小写）。
+
+    注册表中保留了后缀的原始大小写（见 Register._check_suffixes），因此在这里缓存规范化结果。
+    """
+    return suffix[1:].lower() if suffix.startswith(".") else suffix.lower()
+
 
 def _get_handler_return_type(handler_class) -> str:
     """
     获取 handler 类的返回类型。
 
     优先使用 handler 类的 return_type 属性，否则从 DEFAULT_RETURN_TYPES 查找。
+    结果按类缓存，同一个 handler 覆盖多个后缀时只解析一次。
     """
+    cached = _RETURN_TYPE_CACHE.get(handler_class)
+    if cached is not None:
+        return cached
+
     # 优先使用类上定义的 return_type 属性
-    if hasattr(handler_class, "return_type"):
-        return handler_class.return_type
+    return_type = getattr(handler_class, "return_type", _MISSING)
+    if return_type is _MISSING:
+        # 从默认映射查找
+        return_type = DEFAULT_RETURN_TYPES.get(handler_class.__name__, "Any")
 
-    # 从默认映射查找
-    class_name = handler_class.__name__
-    return DEFAULT_RETURN_TYPES.get(class_name, "Any")
+    _RETURN_TYPE_CACHE[handler_class] = return_type
+    return return_type
 
 
-def _collect_suffix_info() -> dict[str, dict]:
+def _collect_suffix_info() -> tuple[
+    Mapping[str, tuple[str, ...]], Mapping[str, tuple[str, ...]]
+]:
     """
-    从 IORegistry 收集所有后缀信息。
+    从 IORegistry 收集所有后缀信息（只遍历一次注册表），按模态分组返回类型并建立模态到后缀的索引。
+
+    结果按 (id(IORegistry), IORegistry.version) 缓存，注册表未变化时直接复用；
+    返回的是只读视图，调用方之间不会互相影响。直接修改嵌套的模态字典或已注册 handler 的
+    return_type 不会更新 version，需要随后调用 IORegistry._collision_suffix_manually_update()。
+
+    每个后缀先记录为 SuffixInfo，后注册的 handler（或其他模态）会覆盖同名后缀，
+    分组和索引都只基于覆盖后的最终结果。
 
     Returns:
-        {
-            suffix: {
-                "handler": handler_class,
-                "return_type": "PIL.Image.Image",
-                "modality": "Image",
-                "is_collision": False,
-            }
-        }
+        (
+            {
+                "Image": ("PIL.Image.Image",),
+                "Text": ("dict[str, Any]", "str"),
+                "Video": ("torchvision.io.VideoReader",),
+            },
+            {
+                "Image": ("png", "jpg", ...),
+                ...
+            },
+        )
     """
-    suffix_info: dict[str, dict] = {}
-    collision_suffixes = IORegistry.collision_suffix
+    global _CACHE, _CACHE_KEY
+    cache_key = (id(IORegistry), IORegistry.version)
+    if _CACHE is not None and _CACHE_KEY == cache_key:
+        return _CACHE
+
+    # 注册表变化后 handler 的 return_type 也可能变化，依赖注册表的缓存一起清空
+    _STUB_TYPE_CACHE.clear()
+    _RETURN_TYPE_CACHE.clear()
+    suffix_info: dict[str, SuffixInfo] = {}
 
     for modality, registry in IORegistry.items():
         base_io = registry.get("BaseIO")
@@ -79,192 +227,99 @@ def _collect_suffix_info() -> dict[str, dict]:
         # 处理 base suffixes
         if base_io:
             for suffix in base_suffixes:
-                suffix_lower = suffix.lstrip(".").lower()
+                suffix_lower = _normalize_suffix(suffix)
                 if suffix_lower not in custom_handlers:
-                    suffix_info[suffix_lower] = {
-                        "handler": base_io,
-                        "return_type": _get_handler_return_type(base_io),
-                        "modality": modality,
-                        "is_collision": suffix_lower in collision_suffixes,
-                    }
+                    suffix_info[suffix_lower] = SuffixInfo(
+                        modality, _get_handler_return_type(base_io)
+                    )
 
         # 处理 custom handlers
         for suffix, handler in custom_handlers.items():
             if handler:
-                suffix_lower = suffix.lstrip(".").lower()
-                suffix_info[suffix_lower] = {
-                    "handler": handler,
-                    "return_type": _get_handler_return_type(handler),
-                    "modality": modality,
-                    "is_collision": suffix_lower in collision_suffixes,
-                }
-
-    return suffix_info
-
-
-def _group_by_modality(suffix_info: dict[str, dict]) -> dict[str, set[str]]:
-    """
-    按模态分组返回类型。
-
-    Returns:
-        {
-            "Image": {"PIL.Image.Image"},
-            "Text": {"str", "dict[str, Any]"},
-            "Video": {"torchvision.io.VideoReader"},
-        }
-    """
-    groups: dict[str, set[str]] = {}
-
+                suffix_lower = _normalize_suffix(suffix)
+                suffix_info[suffix_lower] = SuffixInfo(
+                    modality, _get_handler_return_type(handler)
+                )
+
+    # 后缀可能被后面的 handler（或其他模态）覆盖，只按最终的 suffix_info 分组
+    # 每个模态通常只有 1~3 种返回类型，用元组线性去重比 set 更省内存
+    modality_groups: dict[str, tuple[str, ...]] = {}
+    modality_suffixes: dict[str, list[str]] = {}
     for suffix, info in suffix_info.items():
-        modality = info["modality"]
-        return_type = info["return_type"]
-        if modality not in groups:
-            groups[modality] = set()
-        groups[modality].add(return_type)
-
-    return groups
-
-
-def _generate_modality_overload(modality: str, return_types: set[str]) -> list[str]:
-    """生成基于 modality 参数的 @overload 块。"""
-    # 构建返回类型
-    if len(return_types) == 1:
-        return_type = next(iter(return_types))
-        stub_type = TYPE_STUB_NAMES.get(return_type, return_type)
-    else:
-        # 多个返回类型，使用 Union
-        type_strs = [TYPE_STUB_NAMES.get(t, t) for t in sorted(return_types)]
-        stub_type = f"Union[{', '.join(type_strs)}]"
-
-    lines = [
-        f"    # modality=\"{modality}\"",
-        "    @overload",
-        "    def load(",
-        "        self,",
-        "        path: Union[str, PathLike[str]],",
-        f'        modality: Literal["{modality}"],',
-        "        collision_dict: Optional[dict[str, str]] = None,",
-        "        **kwargs: Any,",
-        f"    ) -> {stub_type}: ...",
-        "",
-    ]
-    return lines
-
-
-def _generate_stub_content(suffix_info: dict[str, dict]) -> str:
-    """生成完整的 stub 文件内容。"""
-    modality_groups = _group_by_modality(suffix_info)
-
-    # 收集所有返回类型以确定需要的 imports
-    all_return_types: set[str] = set()
-    for return_types in modality_groups.values():
-        all_return_types.update(return_types)
-
+        cur = modality_groups.get(info.modality, ())
+        if info.return_type not in cur:
+            modality_groups[info.modality] = cur + (info.return_type,)
+        modality_suffixes.setdefault(info.modality, []).append(suffix)
+    modality_groups = {m: tuple(sorted(t)) for m, t in modality_groups.items()}
+    _CACHE = (
+        MappingProxyType(modality_groups),
+        MappingProxyType({m: tuple(sfx) for m, sfx in modality_suffixes.items()}),
+    )
+    _CACHE_KEY = cache_key
+    return _CACHE
+
+
+def _generate_modality_overload(modality: str, return_types: tuple[str, ...]) -> str:
+    """生成基于 modality 参数的 @overload 块（return_types 已排序去重）。"""
+    stub_type = _STUB_TYPE_CACHE.get(return_types)
+    if stub_type is None:
+        # 构建返回类型
+        if len(return_types) == 1:
+            return_type = return_types[0]
+            stub_type = TYPE_STUB_NAMES.get(return_type, return_type)
+        else:
+            # 多个返回类型，使用 Union
+            type_strs = [TYPE_STUB_NAMES.get(t, t) for t in return_types]
+            stub_type = f"Union[{', '.join(type_strs)}]"
+        _STUB_TYPE_CACHE[return_types] = stub_type
+
+    return _OVERLOAD_TEMPLATE.format(modality=modality, stub_type=stub_type)
+
+
+def _iter_content_chunks(modality_groups: Mapping[str, tuple[str, ...]]) -> Iterator[bytes]:
+    """逐段生成 UTF-8 编码的 stub 文件内容：文件头、类型 imports、类定义开头、各 overload 块和文件尾。"""
     # 收集需要的 imports
-    imports_needed: set[str] = set()
-    for return_type in all_return_types:
-        if return_type in TYPE_IMPORTS:
-            imports_needed.add(TYPE_IMPORTS[return_type])
+    imports_needed = {
+        TYPE_IMPORTS[t]
+        for return_types in modality_groups.values()
+        for t in return_types
+        if t in TYPE_IMPORTS
+    }
 
     # 文件头
-    lines = [
-        '"""',
-        "Auto-generated stub file for IO.load() type hints.",
-        "",
-        "Generated by: python -m CLTrainingFramework.io",
-        "Do not edit manually - regenerate after registering new handlers.",
-        "",
-        "Usage:",
-        '    image = IO.load("test.png", modality="Image")  # -> PILImage',
-        '    text = IO.load("file.txt", modality="Text")    # -> str',
-        '    data = IO.load("config.json", modality="Text") # -> Union[str, dict]',
-        '    video = IO.load("clip.mp4", modality="Video")  # -> VideoReader',
-        '"""',
-        "",
-        "from typing import overload, Union, Optional, Any, Literal",
-        "from os import PathLike",
-    ]
+    yield _HEADER_BYTES
 
     # 添加类型 imports
     for imp in sorted(imports_needed):
-        lines.append(imp)
-
-    lines.extend([
-        "",
-        "",
-        "class IO:",
-        '    """',
-        "    IO Router with type inference based on modality parameter.",
-        "",
-        "    When modality is specified, returns the corresponding type.",
-        "    Without modality, returns Any (suffix-based auto-detection at runtime).",
-        '    """',
-        "",
-        "    def __init__(self, modality: Optional[str] = None) -> None: ...",
-        "",
-    ])
-
-    # 按模态生成 overloads
-    modality_order = ["Image", "Text", "Video"]
+        yield f"{imp}\n".encode("utf-8")
 
-    # 先按预定义顺序生成
-    for modality in modality_order:
-        if modality in modality_groups:
-            lines.extend(_generate_modality_overload(modality, modality_groups[modality]))
+    yield _CLASS_BYTES
 
-    # 生成其他未在预定义顺序中的模态
-    for modality, return_types in modality_groups.items():
-        if modality not in modality_order:
-            lines.extend(_generate_modality_overload(modality, return_types))
+    # 按模态生成 overloads：先按预定义顺序，再追加其他未在预定义顺序中的模态
+    modality_order = ["Image", "Text", "Video"]
+    ordered = [m for m in modality_order if m in modality_groups] + [
+        m for m in modality_groups if m not in modality_order
+    ]
+    for modality in ordered:
+        overload = _generate_modality_overload(modality, modality_groups[modality])
+        yield overload.encode("utf-8")
 
     # 通用 fallback（不指定 modality 时）
-    lines.extend([
-        "    # Fallback when modality is not specified (auto-detection)",
-        "    @overload",
-        "    def load(",
-        "        self,",
-        "        path: Union[str, PathLike[str]],",
-        "        modality: None = None,",
-        "        collision_dict: Optional[dict[str, str]] = None,",
-        "        **kwargs: Any,",
-        "    ) -> Any: ...",
-        "",
-        "    # Implementation signature",
-        "    def load(",
-        "        self,",
-        "        path: Union[str, PathLike[str]],",
-        "        modality: Optional[str] = None,",
-        "        collision_dict: Optional[dict[str, str]] = None,",
-        "        **kwargs: Any,",
-        "    ) -> Any: ...",
-        "",
-        "    def write(",
-        "        self,",
-        "        path: Union[str, PathLike[str]],",
-        "        data: Any,",
-        "        modality: Optional[str] = None,",
-        "        collision_dict: Optional[dict[str, str]] = None,",
-        "        **kwargs: Any,",
-        "    ) -> None: ...",
-        "",
-        "    def get_io(",
-        "        self,",
-        "        path: Union[str, PathLike[str]],",
-        "        modality: Optional[str] = None,",
-        "        collision_dict: Optional[dict[str, str]] = None,",
-        "    ) -> Any: ...",
-        "",
-        "    def delete_cache(self, name: str) -> None: ...",
-        "",
-    ])
-
-    return "\n".join(lines)
+    yield _FOOTER_BYTES
+
+
+def _file_digest(path: Path) -> str:
+    """计算文件内容的 blake2b 摘要。"""
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
 
 
 def generate_io_stubs(output_dir: Optional[Path] = None) -> Path:
     """
     生成 IO 类的类型存根文件。
 
+    先只计算新内容的 hash 并与磁盘上的现有文件比较，内容未变化时不触碰磁盘，保留原文件的 mtime；
+    否则流式写入同目录下唯一命名的临时文件，再通过 os.replace 原子替换，IDE 不会读到写了一半的文件。
+
     Args:
         output_dir: 输出目录，默认为 io 包所在目录
 
@@ -277,28 +332,47 @@ def generate_io_stubs(output_dir: Optional[Path] = None) -> Path:
     output_dir = Path(output_dir)
     output_file = output_dir / "Mapping.pyi"
 
-    # 收集信息并生成内容
-    suffix_info = _collect_suffix_info()
-    content = _generate_stub_content(suffix_info)
-
-    # 写入文件
-    output_file.write_text(content, encoding="utf-8")
+    # 收集信息，先计算 hash，内容未变化时直接返回，避免 IDE 重新索引
+    modality_groups, _ = _collect_suffix_info()
+    hasher = hashlib.blake2b(digest_size=16)
+    for chunk in _iter_content_chunks(modality_groups):
+        hasher.update(chunk)
+    if output_file.exists() and _file_digest(output_file) == hasher.hexdigest():
+        return output_file
+
+    # 只在需要写入时才导入，避免增加 import CLTrainingFramework.io 的开销
+    import tempfile
+
+    # 临时文件必须和目标在同一目录（同一文件系统）才能原子替换，唯一命名避免并发运行互相覆盖
+    f = tempfile.NamedTemporaryFile(
+        dir=output_dir, prefix="Mapping.", suffix=".pyi.tmp", delete=False
+    )
+    tmp_file = Path(f.name)
+    try:
+        with f:
+            for chunk in _iter_content_chunks(modality_groups):
+                f.write(chunk)
+        # NamedTemporaryFile 默认权限为 0600，沿用原文件权限（首次生成时为 0644）
+        mode = output_file.stat().st_mode & 0o777 if output_file.exists() else 0o644
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     return output_file
 
 
 def print_registry_summary() -> None:
     """打印当前注册表摘要（用于调试）。"""
-    suffix_info = _collect_suffix_info()
-    modality_groups = _group_by_modality(suffix_info)
+    modality_groups, modality_suffixes = _collect_suffix_info()
 
     print("IORegistry Summary:")
     print("-" * 40)
     for modality, return_types in modality_groups.items():
         # 统计该模态下的后缀数量
-        suffixes = [s for s, info in suffix_info.items() if info["modality"] == modality]
-        print(f"  {modality}: {len(suffixes)} suffixes")
-        print(f"    Return types: {', '.join(sorted(return_types))}")
+        print(f"  {modality}: {len(modality_suffixes[modality])} suffixes")
+        print(f"    Return types: {', '.join(return_types)}")
 
     collision = IORegistry.collision_suffix
     if collision:
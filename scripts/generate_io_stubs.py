@@ -0,0 +1,35 @@
+"""
+pre-commit entry point for regenerating io/Mapping.pyi.
+
+The repository root is the CLTrainingFramework package itself and there is no packaging to install it,
+so this script binds the checkout it lives in to the name CLTrainingFramework (whatever the checkout
+directory is called) and writes the stub into this checkout's io/ directory.
+
+Usage:
+    python scripts/generate_io_stubs.py
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _load_checkout() -> None:
+    spec = importlib.util.spec_from_file_location(
+        "CLTrainingFramework",
+        _ROOT / "__init__.py",
+        submodule_search_locations=[str(_ROOT)],
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["CLTrainingFramework"] = module
+    spec.loader.exec_module(module)
+
+
+if __name__ == "__main__":
+    _load_checkout()
+    from CLTrainingFramework.io.__main__ import main
+
+    main(["--output-dir", str(_ROOT / "io")])